@@ -0,0 +1,266 @@
+"""
+单条记录推理延迟基准测试脚本
+沿用 interactive_predict 的单条记录路径：构建特征后用 output.model_path 中的模型预测，
+分别测量冷启动和热运行，输出机器可读的JSON报告
+"""
+import time
+
+# 冷启动计时从脚本开始执行算起
+_script_start = time.perf_counter()
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+# 添加项目根目录到sys.path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+def load_records(data_path, n_records):
+    """
+    从原始数据中读取用于测试的记录
+    
+    Args:
+        data_path (str): 原始数据路径
+        n_records (int): 记录条数
+        
+    Returns:
+        list: 原始记录列表（字段同 get_user_input 的返回值）
+    """
+    import pandas as pd
+    columns = ['cat_id', 'cat1', 'gender', 'property', 'birthday_date', 'day_date', 'buy_mount', 'auction_id']
+    data = pd.read_csv(data_path, usecols=columns, dtype=str, encoding='utf-8-sig', nrows=n_records)
+    records = []
+    for row in data.to_dict('records'):
+        row['buy_mount'] = float(row['buy_mount'])
+        row['auction_id'] = int(row['auction_id'])
+        records.append(row)
+    # 数据不足时循环使用
+    while len(records) < n_records:
+        records.extend(records[:n_records - len(records)])
+    return records
+
+def summarize(samples):
+    """
+    计算延迟样本的统计量
+    
+    Args:
+        samples (list): 延迟样本（秒）
+        
+    Returns:
+        dict: 均值、最小值、最大值和 p50/p95/p99（秒）
+    """
+    import numpy as np
+    values = np.asarray(samples, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]).tolist()
+    return {
+        'count': len(values),
+        'mean': float(values.mean()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'p50': p50,
+        'p95': p95,
+        'p99': p99
+    }
+
+def score_batch(model, records):
+    """
+    按单条记录路径构建特征并预测一个批次
+    
+    Args:
+        model: 已训练的模型
+        records (list): 原始记录列表
+        
+    Returns:
+        tuple: (特征构建耗时, 预测耗时)，单位为秒
+    """
+    import pandas as pd
+    from scripts.interactive_predict import featurize_record
+    
+    featurize_start = time.perf_counter()
+    features = pd.concat([featurize_record(record) for record in records], ignore_index=True)
+    predict_start = time.perf_counter()
+    model.predict(features)
+    predict_end = time.perf_counter()
+    return predict_start - featurize_start, predict_end - predict_start
+
+def cold_run(model_path, data_path):
+    """
+    冷启动测量（在新进程中执行）：导入、加载模型、第一次构建特征和预测
+    
+    Returns:
+        dict: 各阶段耗时（秒）
+    """
+    # 导入推理路径用到的全部模块
+    import_start = time.perf_counter()
+    import joblib
+    import pandas
+    import sklearn
+    from scripts.interactive_predict import featurize_record
+    import_seconds = time.perf_counter() - import_start
+    
+    record = load_records(data_path, 1)
+    
+    load_start = time.perf_counter()
+    model = joblib.load(model_path)
+    load_seconds = time.perf_counter() - load_start
+    
+    featurize_seconds, predict_seconds = score_batch(model, record)
+    return {
+        'startup_seconds': import_start - _script_start,
+        'import_seconds': import_seconds,
+        'load_seconds': load_seconds,
+        'featurize_seconds': featurize_seconds,
+        'predict_seconds': predict_seconds,
+        'total_seconds': time.perf_counter() - _script_start
+    }
+
+def benchmark_latency(model_path=None, data_path=None, output_path=None, batch_sizes=None,
+                      iterations=None, warmup=None, cold_runs=None):
+    """
+    运行单条记录推理延迟基准测试
+    
+    Args:
+        model_path (str): 模型路径
+        data_path (str): 原始数据路径（用于抽取测试记录）
+        output_path (str): 报告保存路径
+        batch_sizes (list): 批次大小列表
+        iterations (int): 每个批次大小的热运行次数
+        warmup (int): 每个批次大小正式计时前的预热次数
+        cold_runs (int): 冷启动测量次数（每次启动一个新进程）
+        
+    Returns:
+        dict: 基准测试报告
+    """
+    from configs.config_manager import config_manager
+    
+    # 获取配置
+    if model_path is None:
+        model_path = config_manager.get('output.model_path')
+        # 转换为绝对路径
+        model_path = os.path.join(project_root, model_path)
+    if data_path is None:
+        data_path = config_manager.get('data.raw_data_path')
+        # 转换为绝对路径
+        data_path = os.path.join(project_root, data_path)
+    if output_path is None:
+        output_path = config_manager.get('output.latency_report_path')
+        # 转换为绝对路径
+        output_path = os.path.join(project_root, output_path)
+    if batch_sizes is None:
+        batch_sizes = config_manager.get('benchmark.batch_sizes', [1, 8, 64, 512])
+    if iterations is None:
+        iterations = config_manager.get('benchmark.iterations', 50)
+    if warmup is None:
+        warmup = config_manager.get('benchmark.warmup', 5)
+    if cold_runs is None:
+        cold_runs = config_manager.get('benchmark.cold_runs', 3)
+    
+    # 检查模型文件是否存在
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"找不到模型文件 {model_path}，请先运行训练脚本: python scripts/train_model.py")
+    
+    # 确保输出目录存在
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    
+    # 冷启动：每次在新进程中导入、加载模型并预测一条记录（cold_runs 为0时跳过）
+    cold = None
+    if cold_runs > 0:
+        print(f"正在测量冷启动（{cold_runs} 次）...")
+        cold_samples = []
+        for _ in range(cold_runs):
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--cold-child', '--model', model_path, '--data', data_path],
+                capture_output=True, text=True, check=True)
+            cold_samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        cold = {key: summarize([sample[key] for sample in cold_samples]) for key in cold_samples[0]}
+    
+    # 热运行：模型只加载一次，按批次大小重复测量
+    # 直接测量模型本身（不经过预测缓存），否则重复的记录只会测到缓存命中
+    import joblib
+    import numpy as np
+    import sklearn
+    
+    model = joblib.load(model_path)
+    records = load_records(data_path, max(batch_sizes))
+    
+    warm = {}
+    for batch_size in batch_sizes:
+        print(f"正在测量热运行（批次大小 {batch_size}, {iterations} 次）...")
+        batch = records[:batch_size]
+        for _ in range(warmup):
+            score_batch(model, batch)
+        featurize_samples, predict_samples = [], []
+        for _ in range(iterations):
+            featurize_seconds, predict_seconds = score_batch(model, batch)
+            featurize_samples.append(featurize_seconds)
+            predict_samples.append(predict_seconds)
+        latency_samples = (np.asarray(featurize_samples) + np.asarray(predict_samples)).tolist()
+        warm[str(batch_size)] = {
+            'batch_size': batch_size,
+            'latency_seconds': summarize(latency_samples),
+            'per_record_p50_seconds': float(np.percentile(latency_samples, 50)) / batch_size,
+            'featurize_seconds': summarize(featurize_samples),
+            'predict_seconds': summarize(predict_samples)
+        }
+    
+    report = {
+        'timestamp': time.time(),
+        'model_path': model_path,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'scikit-learn': sklearn.__version__
+        },
+        'settings': {
+            'batch_sizes': batch_sizes,
+            'iterations': iterations,
+            'warmup': warmup,
+            'cold_runs': cold_runs
+        },
+        'cold': cold,
+        'warm': warm
+    }
+    
+    if cold is not None:
+        print("冷启动（中位数）:")
+        print(f"  导入 {cold['import_seconds']['p50'] * 1000:.1f} 毫秒, "
+              f"加载模型 {cold['load_seconds']['p50'] * 1000:.1f} 毫秒, "
+              f"构建特征 {cold['featurize_seconds']['p50'] * 1000:.2f} 毫秒, "
+              f"预测 {cold['predict_seconds']['p50'] * 1000:.2f} 毫秒")
+    print("热运行延迟 p50/p95/p99（毫秒）:")
+    for batch_size, result in warm.items():
+        latency = result['latency_seconds']
+        print(f"  批次大小 {batch_size}: {latency['p50'] * 1000:.2f}/{latency['p95'] * 1000:.2f}/"
+              f"{latency['p99'] * 1000:.2f} (特征 {result['featurize_seconds']['p50'] * 1000:.2f}, "
+              f"预测 {result['predict_seconds']['p50'] * 1000:.2f})")
+    
+    print(f"正在保存基准测试报告到: {output_path}")
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='单条记录推理延迟基准测试')
+    parser.add_argument('--model', type=str, help='模型路径')
+    parser.add_argument('--data', type=str, help='原始数据路径（用于抽取测试记录）')
+    parser.add_argument('--output', type=str, help='报告保存路径')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', help='批次大小列表')
+    parser.add_argument('--iterations', type=int, help='每个批次大小的热运行次数')
+    parser.add_argument('--warmup', type=int, help='预热次数')
+    parser.add_argument('--cold-runs', type=int, help='冷启动测量次数')
+    parser.add_argument('--cold-child', action='store_true', help=argparse.SUPPRESS)
+    
+    args = parser.parse_args()
+    
+    if args.cold_child:
+        print(json.dumps(cold_run(args.model, args.data)))
+    else:
+        benchmark_latency(args.model, args.data, args.output, args.batch_sizes,
+                          args.iterations, args.warmup, args.cold_runs)
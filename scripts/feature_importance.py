@@ -0,0 +1,119 @@
+"""
+置换特征重要性脚本
+"""
+import argparse
+import os
+import sys
+import joblib
+import numpy as np
+
+# 添加项目根目录到sys.path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from configs.config_manager import config_manager
+from utils.data_io import load_processed_data
+from utils.design_matrix import drop_missing_rows, split_indices
+from utils.feature_importance import permutation_importance
+
+def compute_feature_importance(data_path=None, model_path=None, output_path=None, sample_size=None,
+                               n_repeats=None, n_jobs=None, plot=False, all_rows=False):
+    """
+    计算并保存原始特征列的置换重要性
+    
+    Args:
+        data_path (str): 数据路径（CSV文件或分区数据集目录）
+        model_path (str): 模型路径
+        output_path (str): 重要性结果保存路径
+        sample_size (int): 行子样本大小
+        n_repeats (int): 每个特征的置换次数
+        n_jobs (int): 并行的工作进程数
+        plot (bool): 是否绘制特征重要性图
+        all_rows (bool): 使用全部行而不是训练时留出的测试集（仅当 data_path 本身就是留出数据时使用）
+        
+    Returns:
+        pd.DataFrame: 特征重要性
+    """
+    # 获取配置
+    if data_path is None:
+        data_path = config_manager.get('data.processed_data_path')
+        # 转换为绝对路径
+        data_path = os.path.join(project_root, data_path)
+    if model_path is None:
+        model_path = config_manager.get('output.model_path')
+        # 转换为绝对路径
+        model_path = os.path.join(project_root, model_path)
+    if output_path is None:
+        output_path = config_manager.get('output.importance_path')
+        # 转换为绝对路径
+        output_path = os.path.join(project_root, output_path)
+    if sample_size is None:
+        sample_size = config_manager.get('importance.sample_size')
+    if n_repeats is None:
+        n_repeats = config_manager.get('importance.n_repeats', 5)
+    if n_jobs is None:
+        n_jobs = config_manager.get('importance.n_jobs', -1)
+    
+    # 确保输出目录存在
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    
+    # 读取数据
+    feature_columns = config_manager.get('features.categorical') + config_manager.get('features.numerical')
+    target = 'age'
+    print(f"正在读取数据: {data_path}")
+    data = drop_missing_rows(load_processed_data(data_path, feature_columns + [target]),
+                             feature_columns + [target])
+    
+    # 在训练集上计算会放大模型过拟合的特征，默认只使用与 train_model 相同划分得到的测试集
+    if not all_rows:
+        _, test_idx = split_indices(len(data), config_manager.get('data.test_size'),
+                                    config_manager.get('data.random_state'))
+        data = data.iloc[np.sort(test_idx)]
+        print(f"使用留出的测试集: {len(data)} 行")
+    
+    # 加载模型
+    print(f"正在加载模型: {model_path}")
+    model = joblib.load(model_path)
+    
+    # 计算置换重要性
+    n_rows = len(data) if sample_size is None else min(sample_size, len(data))
+    print(f"正在计算置换重要性（子样本 {n_rows} 行, 每个特征置换 {n_repeats} 次）...")
+    importance = permutation_importance(
+        model, data[feature_columns], data[target],
+        n_repeats=n_repeats,
+        sample_size=sample_size,
+        n_jobs=n_jobs,
+        confidence=config_manager.get('importance.confidence', 0.95),
+        random_state=config_manager.get('data.random_state'))
+    
+    print(f"基准 RMSE = {importance.attrs['baseline_rmse']:.2f}")
+    for row in importance.itertuples():
+        print(f"  {row.feature}: {row.importance_mean:.4f} "
+              f"[{row.ci_lower:.4f}, {row.ci_upper:.4f}]")
+    
+    print(f"正在保存特征重要性到: {output_path}")
+    importance.to_csv(output_path, index=False)
+    
+    if plot:
+        from utils.visualization import plot_feature_importance
+        plot_feature_importance(importance['feature'], importance['importance_mean'], top_n=len(importance))
+    
+    return importance
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='计算原始特征列的置换重要性')
+    parser.add_argument('--data', type=str, help='数据路径')
+    parser.add_argument('--model', type=str, help='模型路径')
+    parser.add_argument('--output', type=str, help='重要性结果保存路径')
+    parser.add_argument('--sample-size', type=int, help='行子样本大小')
+    parser.add_argument('--n-repeats', type=int, help='每个特征的置换次数')
+    parser.add_argument('--n-jobs', type=int, help='并行的工作进程数')
+    parser.add_argument('--plot', action='store_true', help='绘制特征重要性图')
+    parser.add_argument('--all-rows', action='store_true',
+                        help='使用 --data 的全部行（仅当它本身就是留出数据时使用）')
+    
+    args = parser.parse_args()
+    
+    compute_feature_importance(args.data, args.model, args.output, args.sample_size,
+                               args.n_repeats, args.n_jobs, args.plot, args.all_rows)
@@ -7,6 +7,7 @@ import numpy as np
 import joblib
 import os
 import sys
+import time
 from datetime import datetime
 
 # 添加项目根目录到sys.path
@@ -15,13 +16,16 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from configs.config_manager import config_manager
+from utils.data_io import apply_schema
+from utils.prediction_cache import with_prediction_cache
+from utils.scoring_metrics import ScoringMetrics, start_reporter
 
 def get_user_input():
     """
     获取用户输入的婴儿信息
     
     Returns:
-        pd.DataFrame: 包含用户输入信息的数据框
+        dict: 用户输入的原始记录
     """
     print("请输入婴儿的信息：")
     
@@ -37,6 +41,36 @@ def get_user_input():
     buy_mount = float(input("buy_mount (例如: 5): "))
     auction_id = int(input("auction_id (例如: 123456789): "))
     
+    return {
+        'cat_id': cat_id,
+        'cat1': cat1,
+        'gender': gender,
+        'property': property_str,
+        'birthday_date': birthday_date_str,
+        'day_date': day_date_str,
+        'buy_mount': buy_mount,
+        'auction_id': auction_id
+    }
+
+def featurize_record(record):
+    """
+    把一条原始记录转换为模型输入的特征
+    
+    Args:
+        record (dict): 原始记录（字段同 get_user_input 的返回值）
+        
+    Returns:
+        pd.DataFrame: 包含特征的单行数据框
+    """
+    cat_id = record['cat_id']
+    cat1 = record['cat1']
+    gender = record['gender']
+    property_str = record['property']
+    birthday_date_str = record['birthday_date']
+    day_date_str = record['day_date']
+    buy_mount = record['buy_mount']
+    auction_id = record['auction_id']
+    
     # 处理property特征
     if pd.isna(property_str) or property_str == "":
         property_count = 0
@@ -84,6 +118,9 @@ def get_user_input():
         'auction_id_last_digits': [auction_id_last_digits]
     })
     
+    # 与训练数据保持一致的数据类型
+    data = apply_schema(data, 'processed')
+    
     return data
 
 def predict_age_interactive():
@@ -102,14 +139,32 @@ def predict_age_interactive():
     
     # 加载模型
     print(f"正在加载模型: {model_path}")
-    model = joblib.load(model_path)
+    feature_columns = config_manager.get('features.categorical') + config_manager.get('features.numerical')
+    model = with_prediction_cache(joblib.load(model_path), feature_columns)
+    
+    scoring_metrics = ScoringMetrics(config_manager.get('monitoring.latency_buckets'))
+    reporter = start_reporter(scoring_metrics, project_root)
     
     # 获取用户输入
-    user_data = get_user_input()
+    record = get_user_input()
     
-    # 进行预测
+    # 构建特征并预测
     print("正在进行预测...")
-    prediction = model.predict(user_data)
+    try:
+        featurize_start = time.perf_counter()
+        user_data = featurize_record(record)
+        model_start = time.perf_counter()
+        scoring_metrics.observe_featurize(model_start - featurize_start)
+        prediction = model.predict(user_data)
+        model_end = time.perf_counter()
+        scoring_metrics.observe_batch(len(user_data), model_end - model_start, model_end - featurize_start)
+    except Exception:
+        scoring_metrics.observe_error()
+        raise
+    finally:
+        # 打分失败时也写出最终快照
+        if reporter is not None:
+            reporter.stop()
     
     # 显示结果
     print(f"\n预测结果:")
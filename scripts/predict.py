@@ -7,6 +7,7 @@ import argparse
 import joblib
 import os
 import sys
+import time
 
 # 添加项目根目录到sys.path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -14,15 +15,23 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from configs.config_manager import config_manager
+from utils.data_io import load_processed_data, filter_loaded_data
+from utils.prediction_cache import PredictionCache, with_prediction_cache
+from utils.scoring_metrics import ScoringMetrics, start_reporter
 
-def predict_age(data_path=None, model_path=None, output_path=None):
+def predict_age(data_path=None, model_path=None, output_path=None, start_month=None, end_month=None,
+                data=None, model=None):
     """
     使用训练好的模型进行预测
     
     Args:
-        data_path (str): 数据路径
+        data_path (str): 数据路径（CSV文件或分区数据集目录）
         model_path (str): 模型路径
         output_path (str): 预测结果保存路径
+        start_month (str): 起始月份（YYYY-MM，包含）
+        end_month (str): 结束月份（YYYY-MM，包含）
+        data (pd.DataFrame): 内存中的数据，提供时不再读取 data_path，仍按日期范围过滤
+        model: 内存中已训练的模型，提供时不再加载 model_path
     """
     # 获取配置
     if data_path is None:
@@ -41,29 +50,61 @@ def predict_age(data_path=None, model_path=None, output_path=None):
     # 确保输出目录存在
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
-    # 读取数据
-    print(f"正在读取数据: {data_path}")
-    data = pd.read_csv(data_path)
-    print(f"数据形状: {data.shape}")
-    
     # 获取特征列
     categorical_features = config_manager.get('features.categorical')
     numerical_features = config_manager.get('features.numerical')
     feature_columns = categorical_features + numerical_features
     
-    # 数据清洗（删除缺失值）
-    data_clean = data.dropna()
-    print(f"清洗后数据形状: {data_clean.shape}")
+    # 内存中的数据同样按日期范围过滤
+    if data is not None:
+        data = filter_loaded_data(data, start_month, end_month)
     
-    X = data_clean[feature_columns]
+    scoring_metrics = ScoringMetrics(config_manager.get('monitoring.latency_buckets'))
+    reporter = start_reporter(scoring_metrics, project_root)
     
-    # 加载模型
-    print(f"正在加载模型: {model_path}")
-    model = joblib.load(model_path)
+    try:
+        # 读取数据（处理后的数据已经是工程特征，读取和清洗计入特征构建耗时）
+        featurize_start = time.perf_counter()
+        if data is None:
+            print(f"正在读取数据: {data_path}")
+            data = load_processed_data(data_path, feature_columns, start_month, end_month)
+            print(f"数据形状: {data.shape}")
+        
+        # 数据清洗（删除缺失值）
+        data_clean = data[feature_columns].dropna()
+        print(f"清洗后数据形状: {data_clean.shape}")
+        
+        X = data_clean[feature_columns]
+        scoring_metrics.observe_featurize(time.perf_counter() - featurize_start)
+        
+        # 加载模型
+        if model is None:
+            print(f"正在加载模型: {model_path}")
+            model = joblib.load(model_path)
+        model = with_prediction_cache(model, feature_columns)
+        
+        # 分批预测
+        print("正在进行预测...")
+        batch_size = config_manager.get('prediction.batch_size', 10000)
+        predictions = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), batch_size):
+            batch = X.iloc[start:start + batch_size]
+            model_start = time.perf_counter()
+            predictions[start:start + len(batch)] = model.predict(batch)
+            scoring_metrics.observe_batch(len(batch), time.perf_counter() - model_start)
+    except Exception:
+        scoring_metrics.observe_error()
+        raise
+    finally:
+        # 打分失败时也写出最终快照
+        if reporter is not None:
+            reporter.stop()
+            print(f"打分性能指标已写出到: {reporter.path}")
     
-    # 预测
-    print("正在进行预测...")
-    predictions = model.predict(X)
+    if isinstance(model, PredictionCache):
+        stats = model.stats()
+        print(f"预测缓存: 命中 {stats['hits']}, 未命中 {stats['misses']}, "
+              f"命中率 {stats['hit_rate']:.1%}, 淘汰 {stats['evictions']}")
     
     # 保存预测结果
     results = pd.DataFrame({
@@ -76,6 +117,13 @@ def predict_age(data_path=None, model_path=None, output_path=None):
     print("预测完成!")
     print(f"预测值范围: {predictions.min():.2f} - {predictions.max():.2f}")
     
+    snapshot = scoring_metrics.snapshot()
+    latency = snapshot['latency_seconds']
+    print(f"打分性能: {snapshot['rows']} 行, {snapshot['batches']} 批, "
+          f"特征构建 {snapshot['featurize_seconds']:.3f} 秒, 模型 {snapshot['model_seconds']:.3f} 秒, "
+          f"批次延迟 p50/p95/p99 = {latency['p50'] * 1000:.1f}/{latency['p95'] * 1000:.1f}/"
+          f"{latency['p99'] * 1000:.1f} 毫秒")
+    
     return predictions
 
 if __name__ == "__main__":
@@ -83,7 +131,9 @@ if __name__ == "__main__":
     parser.add_argument('--data', type=str, help='数据路径')
     parser.add_argument('--model', type=str, help='模型路径')
     parser.add_argument('--output', type=str, help='预测结果保存路径')
+    parser.add_argument('--start-month', type=str, help='起始月份（YYYY-MM，包含）')
+    parser.add_argument('--end-month', type=str, help='结束月份（YYYY-MM，包含）')
     
     args = parser.parse_args()
     
-    predict_age(args.data, args.model, args.output)
\ No newline at end of file
+    predict_age(args.data, args.model, args.output, args.start_month, args.end_month)
\ No newline at end of file
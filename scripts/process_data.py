@@ -15,6 +15,7 @@ if project_root not in sys.path:
 
 from datetime import datetime
 from configs.config_manager import config_manager
+from utils.data_io import read_csv_with_schema, apply_schema, memory_per_row, write_partitioned_data
 
 def extract_property_features(property_str):
     """
@@ -53,7 +54,8 @@ def extract_date_features(data):
     """
     # 将日期字符串转换为datetime对象
     # 不再使用birthday_date，因为我们无法得知用户生日
-    data['day_date'] = pd.to_datetime(data['day_date'])
+    # 使用固定的日期格式解析，避免逐行推断格式
+    data['day_date'] = pd.to_datetime(data['day_date'], format=config_manager.get('schema.date_format'))
     
     # 提取年、月、日特征 (仅从day_date)
     data['day_year'] = data['day_date'].dt.year
@@ -64,13 +66,32 @@ def extract_date_features(data):
     
     return data
 
-def process_data(input_path=None, output_path=None):
+def save_processed_data(data, output_path, partitioned=False):
+    """
+    保存处理后的数据
+    
+    Args:
+        data (pd.DataFrame): 处理后的数据
+        output_path (str): 输出数据路径（分区模式下为数据集目录）
+        partitioned (bool): 是否按 day_year/day_month 分区写出
+    """
+    if partitioned:
+        print(f"正在按日期分区保存处理后的数据到: {output_path}")
+        manifest = write_partitioned_data(data, output_path)
+        print(f"数据集共 {len(manifest['partitions'])} 个分区")
+    else:
+        print(f"正在保存处理后的数据到: {output_path}")
+        data.to_csv(output_path, index=False)
+
+def process_data(input_path=None, output_path=None, partitioned=False, save=True):
     """
     处理婴儿年龄数据，提取特征
     
     Args:
         input_path (str): 输入数据路径
-        output_path (str): 输出数据路径
+        output_path (str): 输出数据路径（分区模式下为数据集目录）
+        partitioned (bool): 是否按 day_year/day_month 分区写出
+        save (bool): 是否保存处理后的数据，为False时只返回数据
     """
     # 获取配置
     if input_path is None:
@@ -78,13 +99,16 @@ def process_data(input_path=None, output_path=None):
         # 转换为绝对路径
         input_path = os.path.join(project_root, input_path)
     if output_path is None:
-        output_path = config_manager.get('data.processed_data_path')
+        if partitioned:
+            output_path = config_manager.get('data.partitioned_data_path')
+        else:
+            output_path = config_manager.get('data.processed_data_path')
         # 转换为绝对路径
         output_path = os.path.join(project_root, output_path)
     
     # 读取数据
     print(f"正在读取数据: {input_path}")
-    data = pd.read_csv(input_path)
+    data = read_csv_with_schema(input_path, 'raw')
     print(f"原始数据形状: {data.shape}")
     
     # 基础分类特征
@@ -114,11 +138,12 @@ def process_data(input_path=None, output_path=None):
     # 构建最终数据集
     extended_data = pd.concat([data, property_features], axis=1)
     final_data = pd.concat([extended_data[feature_columns], extended_data[target]], axis=1)
+    final_data = apply_schema(final_data, 'processed')
     
     # 保存处理后的数据
-    print(f"正在保存处理后的数据到: {output_path}")
-    final_data.to_csv(output_path, index=False)
-    print(f"处理完成，最终数据形状: {final_data.shape}")
+    if save:
+        save_processed_data(final_data, output_path, partitioned)
+    print(f"处理完成，最终数据形状: {final_data.shape}, 每行内存 {memory_per_row(final_data):.1f} 字节")
     
     return final_data
 
@@ -126,7 +151,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='处理婴儿年龄预测数据')
     parser.add_argument('--input', type=str, help='输入数据路径')
     parser.add_argument('--output', type=str, help='输出数据路径')
+    parser.add_argument('--partitioned', action='store_true', help='按 day_year/day_month 分区写出')
     
     args = parser.parse_args()
     
-    process_data(args.input, args.output)
\ No newline at end of file
+    process_data(args.input, args.output, args.partitioned)
\ No newline at end of file
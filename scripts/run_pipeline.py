@@ -4,21 +4,71 @@
 import argparse
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+import joblib
 
 # 添加项目根目录到sys.path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from scripts.process_data import process_data
+from scripts.process_data import process_data, save_processed_data
 from scripts.train_model import train_model
 from scripts.predict import predict_age
 from configs.config_manager import config_manager
 
-def main():
+def run_in_memory(raw_data_path, processed_data_path, model_path, metrics_path, predictions_path, persist):
+    """
+    在内存中运行流水线：数据和模型直接传给下一步，中间结果在后台线程中保存
+    
+    Args:
+        raw_data_path (str): 原始数据路径
+        processed_data_path (str): 处理后数据保存路径
+        model_path (str): 模型保存路径
+        metrics_path (str): 指标保存路径
+        predictions_path (str): 预测结果保存路径
+        persist (bool): 是否保存处理后的数据和模型
+    """
+    # 中间结果只会被读取，后台线程保存时不会与后续步骤冲突
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='persist') as executor:
+        pending = []
+        
+        # 步骤1: 数据处理
+        print("\n=== 步骤1: 数据处理 ===")
+        final_data = process_data(raw_data_path, processed_data_path, save=False)
+        if persist:
+            pending.append(executor.submit(save_processed_data, final_data, processed_data_path))
+        
+        # 步骤2: 模型训练
+        print("\n=== 步骤2: 模型训练 ===")
+        model, metrics = train_model(processed_data_path, model_path, metrics_path,
+                                     data=final_data, save_model=False)
+        if persist:
+            os.makedirs(os.path.dirname(model_path), exist_ok=True)
+            pending.append(executor.submit(joblib.dump, model, model_path))
+        
+        # 步骤3: 预测
+        print("\n=== 步骤3: 预测 ===")
+        predictions = predict_age(processed_data_path, model_path, predictions_path,
+                                  data=final_data, model=model)
+        
+        # 等待后台保存完成，保存失败时抛出异常
+        for future in pending:
+            future.result()
+
+def main(in_memory=None, persist=None):
     """
     运行完整的婴儿年龄预测流水线
+    
+    Args:
+        in_memory (bool): 是否在内存中把数据和模型直接传给下一步，默认读取 pipeline.in_memory
+        persist (bool): 内存模式下是否在后台线程中保存中间结果，默认读取 pipeline.persist_intermediates
     """
+    if in_memory is None:
+        in_memory = config_manager.get('pipeline.in_memory', True)
+    if persist is None:
+        persist = config_manager.get('pipeline.persist_intermediates', True)
+    
     print("开始运行婴儿年龄预测流水线...")
     
     # 获取配置
@@ -37,22 +87,37 @@ def main():
     predictions_path = config_manager.get('output.predictions_path')
     predictions_path = os.path.join(project_root, predictions_path)
     
-    # 步骤1: 数据处理
-    print("\n=== 步骤1: 数据处理 ===")
-    process_data(raw_data_path, processed_data_path)
-    
-    # 步骤2: 模型训练
-    print("\n=== 步骤2: 模型训练 ===")
-    model, metrics = train_model(processed_data_path, model_path, metrics_path)
-    
-    # 步骤3: 预测
-    print("\n=== 步骤3: 预测 ===")
-    predictions = predict_age(processed_data_path, model_path, predictions_path)
+    if in_memory:
+        run_in_memory(raw_data_path, processed_data_path, model_path, metrics_path, predictions_path, persist)
+    else:
+        # 步骤1: 数据处理
+        print("\n=== 步骤1: 数据处理 ===")
+        process_data(raw_data_path, processed_data_path)
+        
+        # 步骤2: 模型训练
+        print("\n=== 步骤2: 模型训练 ===")
+        model, metrics = train_model(processed_data_path, model_path, metrics_path)
+        
+        # 步骤3: 预测
+        print("\n=== 步骤3: 预测 ===")
+        predictions = predict_age(processed_data_path, model_path, predictions_path)
     
     print("\n=== 流水线执行完成 ===")
-    print(f"模型已保存到: {model_path}")
+    if not in_memory or persist:
+        print(f"处理后的数据已保存到: {processed_data_path}")
+        print(f"模型已保存到: {model_path}")
     print(f"指标已保存到: {metrics_path}")
     print(f"预测结果已保存到: {predictions_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='运行婴儿年龄预测流水线')
+    parser.add_argument('--in-memory', dest='in_memory', action='store_true', default=None,
+                        help='在内存中把数据和模型直接传给下一步')
+    parser.add_argument('--on-disk', dest='in_memory', action='store_false',
+                        help='每一步都从磁盘读取上一步的结果')
+    parser.add_argument('--no-persist', dest='persist', action='store_false', default=None,
+                        help='内存模式下不保存处理后的数据和模型')
+    
+    args = parser.parse_args()
+    
+    main(args.in_memory, args.persist)
\ No newline at end of file
@@ -1,7 +1,6 @@
 """
 模型训练脚本
 """
-import pandas as pd
 import numpy as np
 import argparse
 import json
@@ -14,32 +13,24 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from sklearn.metrics import mean_squared_error, r2_score
-from sklearn.model_selection import train_test_split
-from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder
 from sklearn.pipeline import Pipeline
 from sklearn.ensemble import GradientBoostingRegressor
 import joblib
 from configs.config_manager import config_manager
+from utils.data_io import load_processed_data, processed_data_files, filter_loaded_data
+from utils.design_matrix import (build_preprocessor, build_design_matrix, drop_missing_rows,
+                                 matrix_nbytes, split_indices, cv_split_indices)
+from utils.matrix_cache import design_matrix_fingerprint, save_design_matrix, load_design_matrix, prune_cache
+from utils.segmented_model import SegmentedRegressor
+from utils.profiling import peak_rss_mb, RssSampler
 
-def build_model():
+def build_regressor():
     """
-    构建模型
+    构建回归器
     
     Returns:
-        Pipeline: 构建好的模型管道
+        GradientBoostingRegressor: 未训练的回归器
     """
-    # 获取特征列
-    categorical_features = config_manager.get('features.categorical')
-    numerical_features = config_manager.get('features.numerical')
-    
-    # 列变换：One-Hot编码用于分类特征，数值特征保持不变
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features),
-            ('num', 'passthrough', numerical_features)
-        ])
-    
     # 获取模型参数
     model_params = config_manager.get('model.params')
     
@@ -48,19 +39,247 @@ def build_model():
         regressor = GradientBoostingRegressor(**model_params)
     else:
         raise ValueError(f"不支持的模型类型: {config_manager.get('model.type')}")
+    return regressor
+
+def build_model(preprocessor=None):
+    """
+    构建模型
+    
+    Args:
+        preprocessor (ColumnTransformer): 特征预处理器（可以是已拟合的），默认按特征配置新建
+    
+    Returns:
+        Pipeline: 构建好的模型管道
+    """
+    if preprocessor is None:
+        # 获取特征列
+        categorical_features = config_manager.get('features.categorical')
+        numerical_features = config_manager.get('features.numerical')
+        preprocessor = build_preprocessor(categorical_features, numerical_features)
     
     # 创建管道
-    model = Pipeline(steps=[('prep', preprocessor), ('reg', regressor)])
+    model = Pipeline(steps=[('prep', preprocessor), ('reg', build_regressor())])
     return model
 
-def train_model(data_path=None, model_path=None, metrics_path=None):
+def build_segmented_model():
+    """
+    构建分段模型
+    
+    Returns:
+        SegmentedRegressor: 未训练的分段模型
+    """
+    categorical_features = config_manager.get('features.categorical')
+    numerical_features = config_manager.get('features.numerical')
+    
+    return SegmentedRegressor(
+        build_preprocessor(categorical_features, numerical_features),
+        build_regressor(),
+        segment_column=config_manager.get('segmentation.column', 'cat1'),
+        min_segment_size=config_manager.get('segmentation.min_segment_size', 50),
+        n_jobs=config_manager.get('segmentation.n_jobs', -1),
+        fallback_max_rows=config_manager.get('segmentation.fallback_max_rows'),
+        random_state=config_manager.get('data.random_state'))
+
+def cross_validate(X, y, n_folds, random_state):
+    """
+    在设计矩阵上按行索引做K折交叉验证
+    
+    Args:
+        X (sp.csr_matrix): 设计矩阵
+        y (np.ndarray): 目标值
+        n_folds (int): 折数
+        random_state (int): 随机种子
+        
+    Returns:
+        dict: 交叉验证指标
+    """
+    rmses, r2s = [], []
+    for fold, (train_idx, test_idx) in enumerate(cv_split_indices(len(y), n_folds, random_state), 1):
+        regressor = build_regressor()
+        regressor.fit(X[train_idx], y[train_idx])
+        predictions = regressor.predict(X[test_idx])
+        rmses.append(np.sqrt(mean_squared_error(y[test_idx], predictions)))
+        r2s.append(r2_score(y[test_idx], predictions))
+        print(f"  第{fold}折: RMSE = {rmses[-1]:.2f}, R² Score = {r2s[-1]:.4f}")
+    
+    return {
+        'cv_folds': n_folds,
+        'cv_rmse_mean': float(np.mean(rmses)),
+        'cv_rmse_std': float(np.std(rmses)),
+        'cv_r2_mean': float(np.mean(r2s)),
+        'cv_r2_std': float(np.std(r2s))
+    }
+
+def prepare_design_matrix(data_path, feature_columns, target, start_month=None, end_month=None, data=None):
+    """
+    准备设计矩阵：启用缓存且数据和特征配置未变化时直接加载缓存，否则读取数据并编码
+    
+    Args:
+        data_path (str): 数据路径（CSV文件或分区数据集目录）
+        feature_columns (list): 特征列
+        target (str): 目标列
+        start_month (str): 起始月份（YYYY-MM，包含）
+        end_month (str): 结束月份（YYYY-MM，包含）
+        data (pd.DataFrame): 内存中的训练数据，提供时直接编码
+        
+    Returns:
+        tuple: (X, y, preprocessor)
+    """
+    categorical_features = config_manager.get('features.categorical')
+    numerical_features = config_manager.get('features.numerical')
+    
+    cache_dir = None
+    if data is None and config_manager.get('training.matrix_cache.enabled', False):
+        cache_dir = os.path.join(project_root, config_manager.get('training.matrix_cache.cache_dir'))
+        fingerprint = design_matrix_fingerprint(
+            processed_data_files(data_path, start_month, end_month),
+            {
+                'categorical': categorical_features,
+                'numerical': numerical_features,
+                'target': target,
+                'schema': config_manager.get('schema.processed'),
+                'start_month': start_month,
+                'end_month': end_month
+            },
+            build_preprocessor(categorical_features, numerical_features))
+        cached = load_design_matrix(cache_dir, fingerprint)
+        if cached is not None:
+            X, y, preprocessor = cached
+            print(f"已从缓存加载设计矩阵: {os.path.join(cache_dir, fingerprint)}")
+            print(f"设计矩阵形状: {X.shape}, 占用 {matrix_nbytes(X) / 1024 / 1024:.2f} MB")
+            return X, y, preprocessor
+    
+    if data is None:
+        print(f"正在读取数据: {data_path}")
+        data = load_processed_data(data_path, feature_columns + [target], start_month, end_month)
+        print(f"数据形状: {data.shape}")
+    
+    # 构建设计矩阵（删除缺失值并编码，只构建一次）
+    print("正在构建设计矩阵...")
+    preprocessor = build_preprocessor(categorical_features, numerical_features)
+    X, y = build_design_matrix(data, preprocessor, feature_columns, target)
+    print(f"设计矩阵形状: {X.shape}, 占用 {matrix_nbytes(X) / 1024 / 1024:.2f} MB")
+    
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        print(f"正在缓存设计矩阵到: {save_design_matrix(cache_dir, fingerprint, X, y, preprocessor)}")
+        removed = prune_cache(cache_dir,
+                              config_manager.get('training.matrix_cache.max_entries'),
+                              config_manager.get('training.matrix_cache.max_age_days'))
+        if removed:
+            print(f"已清理 {len(removed)} 个过期的设计矩阵缓存")
+    return X, y, preprocessor
+
+def train_global(X, y, preprocessor, test_size, random_state):
+    """
+    在设计矩阵上训练单个全局模型
+    
+    Args:
+        X (sp.csr_matrix): 设计矩阵
+        y (np.ndarray): 目标值
+        preprocessor (ColumnTransformer): 已拟合的预处理器
+        test_size (float): 测试集比例
+        random_state (int): 随机种子
+        
+    Returns:
+        tuple: (model, y_test, predictions, info)
+    """
+    # 数据划分（只生成行索引）
+    train_idx, test_idx = split_indices(len(y), test_size, random_state)
+    print(f"训练集大小: {len(train_idx)}")
+    print(f"测试集大小: {len(test_idx)}")
+    
+    # 训练模型
+    # 预处理器已在构建设计矩阵时拟合，这里只在设计矩阵上训练回归器
+    print("正在训练模型...")
+    model = build_model(preprocessor)
+    regressor = model.named_steps['reg']
+    X_train, y_train = X[train_idx], y[train_idx]
+    with RssSampler() as sampler:
+        regressor.fit(X_train, y_train)
+    del X_train, y_train
+    
+    # 预测
+    print("正在预测...")
+    predictions = regressor.predict(X[test_idx])
+    
+    info = {
+        'train_size': len(train_idx),
+        'design_matrix_mb': matrix_nbytes(X) / 1024 / 1024
+    }
+    if sampler.peak_mb is not None:
+        info['fit_peak_rss_mb'] = sampler.peak_mb
+    
+    # 交叉验证
+    cv_folds = config_manager.get('training.cv_folds', 0)
+    if cv_folds and cv_folds > 1:
+        print(f"正在进行{cv_folds}折交叉验证...")
+        info.update(cross_validate(X, y, cv_folds, random_state))
+        print(f"  交叉验证 RMSE = {info['cv_rmse_mean']:.2f} ± {info['cv_rmse_std']:.2f}")
+    
+    return model, y[test_idx], predictions, info
+
+def train_segmented(data, feature_columns, target, test_size, random_state):
+    """
+    按分段并行训练多个模型，并用路由预测器评估
+    
+    Args:
+        data (pd.DataFrame): 训练数据
+        feature_columns (list): 特征列
+        target (str): 目标列
+        test_size (float): 测试集比例
+        random_state (int): 随机种子
+        
+    Returns:
+        tuple: (model, y_test, predictions, info)
+    """
+    # 分段模式直接在DataFrame上训练各分段的管道，不使用设计矩阵及其缓存，也不做交叉验证
+    cv_folds = config_manager.get('training.cv_folds', 0)
+    if cv_folds and cv_folds > 1:
+        print(f"警告: 分段模式不支持交叉验证，已忽略 training.cv_folds = {cv_folds}")
+    if config_manager.get('training.matrix_cache.enabled', False):
+        print("警告: 分段模式不使用设计矩阵缓存（training.matrix_cache）")
+    
+    data = drop_missing_rows(data, feature_columns + [target])
+    X = data[feature_columns]
+    y = data[target].to_numpy(dtype=np.float64)
+    
+    # 数据划分（只生成行索引）
+    train_idx, test_idx = split_indices(len(y), test_size, random_state)
+    print(f"训练集大小: {len(train_idx)}")
+    print(f"测试集大小: {len(test_idx)}")
+    
+    # 并行训练各分段模型
+    model = build_segmented_model()
+    print(f"正在按 {model.segment_column} 分段并行训练模型...")
+    model.fit(X.iloc[train_idx], y[train_idx])
+    for key, size in model.segment_sizes_.items():
+        print(f"  分段 {key}: {size} 条样本")
+    
+    # 预测
+    print("正在预测...")
+    predictions = model.predict(X.iloc[test_idx])
+    
+    info = {
+        'train_size': len(train_idx),
+        'segments': model.segment_sizes_
+    }
+    return model, y[test_idx], predictions, info
+
+def train_model(data_path=None, model_path=None, metrics_path=None, start_month=None, end_month=None,
+                segmented=None, data=None, save_model=True):
     """
     训练模型
     
     Args:
-        data_path (str): 数据路径
+        data_path (str): 数据路径（CSV文件或分区数据集目录）
         model_path (str): 模型保存路径
         metrics_path (str): 指标保存路径
+        start_month (str): 训练数据起始月份（YYYY-MM，包含）
+        end_month (str): 训练数据结束月份（YYYY-MM，包含）
+        segmented (bool): 是否按分段训练，默认读取 segmentation.enabled
+        data (pd.DataFrame): 内存中的训练数据，提供时不再读取 data_path（也不使用设计矩阵缓存），仍按日期范围过滤
+        save_model (bool): 是否保存模型
     """
     # 获取配置
     if data_path is None:
@@ -80,44 +299,36 @@ def train_model(data_path=None, model_path=None, metrics_path=None):
     os.makedirs(os.path.dirname(model_path), exist_ok=True)
     os.makedirs(os.path.dirname(metrics_path), exist_ok=True)
     
-    # 读取数据
-    print(f"正在读取数据: {data_path}")
-    data = pd.read_csv(data_path)
-    print(f"数据形状: {data.shape}")
-    
-    # 准备数据
+    # 获取特征列
     categorical_features = config_manager.get('features.categorical')
     numerical_features = config_manager.get('features.numerical')
     feature_columns = categorical_features + numerical_features
     target = 'age'
     
-    # 数据清洗（删除缺失值）
-    data_clean = data.dropna()
-    print(f"清洗后数据形状: {data_clean.shape}")
-    
-    X = data_clean[feature_columns]
-    y = data_clean[target]
-    
-    # 数据划分
     test_size = config_manager.get('data.test_size')
     random_state = config_manager.get('data.random_state')
+    if segmented is None:
+        segmented = config_manager.get('segmentation.enabled', False)
     
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=random_state)
-    
-    print(f"训练集大小: {X_train.shape}")
-    print(f"测试集大小: {X_test.shape}")
-    
-    # 构建和训练模型
-    print("正在构建模型...")
-    model = build_model()
-    
-    print("正在训练模型...")
-    model.fit(X_train, y_train)
+    # 内存中的数据同样按日期范围过滤
+    if data is not None:
+        data = filter_loaded_data(data, start_month, end_month)
     
-    # 预测
-    print("正在预测...")
-    predictions = model.predict(X_test)
+    # 训练模型（全局模型或分段模型）
+    if segmented:
+        if data is None:
+            print(f"正在读取数据: {data_path}")
+            data = load_processed_data(data_path, feature_columns + [target], start_month, end_month)
+            print(f"数据形状: {data.shape}")
+        model, y_test, predictions, info = train_segmented(
+            data, feature_columns, target, test_size, random_state)
+        del data
+    else:
+        X, y, preprocessor = prepare_design_matrix(data_path, feature_columns, target, start_month, end_month,
+                                                   data=data)
+        del data
+        model, y_test, predictions, info = train_global(X, y, preprocessor, test_size, random_state)
+        del X, y
     
     # 评估
     rmse = np.sqrt(mean_squared_error(y_test, predictions))
@@ -126,17 +337,27 @@ def train_model(data_path=None, model_path=None, metrics_path=None):
     metrics = {
         'rmse': float(rmse),
         'r2_score': float(r2),
-        'train_size': len(X_train),
-        'test_size': len(X_test)
+        'train_size': info.pop('train_size'),
+        'test_size': len(y_test)
     }
+    metrics.update(info)
     
     print("模型性能:")
     print(f"  RMSE = {rmse:.2f}")
     print(f"  R² Score = {r2:.4f}")
     
+    # 内存使用
+    if 'fit_peak_rss_mb' in metrics:
+        print(f"训练期间峰值内存(RSS): {metrics['fit_peak_rss_mb']:.1f} MB")
+    peak = peak_rss_mb()
+    if peak is not None:
+        metrics['process_peak_rss_mb'] = peak
+        print(f"进程峰值内存(RSS，含数据读取): {peak:.1f} MB")
+    
     # 保存模型
-    print(f"正在保存模型到: {model_path}")
-    joblib.dump(model, model_path)
+    if save_model:
+        print(f"正在保存模型到: {model_path}")
+        joblib.dump(model, model_path)
     
     # 保存指标
     print(f"正在保存指标到: {metrics_path}")
@@ -150,7 +371,10 @@ if __name__ == "__main__":
     parser.add_argument('--data', type=str, help='数据路径')
     parser.add_argument('--model', type=str, help='模型保存路径')
     parser.add_argument('--metrics', type=str, help='指标保存路径')
+    parser.add_argument('--start-month', type=str, help='起始月份（YYYY-MM，包含）')
+    parser.add_argument('--end-month', type=str, help='结束月份（YYYY-MM，包含）')
+    parser.add_argument('--segmented', action='store_true', default=None, help='按分段并行训练模型')
     
     args = parser.parse_args()
     
-    train_model(args.data, args.model, args.metrics)
\ No newline at end of file
+    train_model(args.data, args.model, args.metrics, args.start_month, args.end_month, args.segmented)
\ No newline at end of file
@@ -0,0 +1,355 @@
+"""
+数据读取工具
+根据 configs/config.yaml 中声明的数据模式读取CSV，只读取需要的列并使用紧凑的数据类型
+"""
+import io
+import json
+import os
+import time
+import pandas as pd
+from configs.config_manager import config_manager
+
+# 分区数据集的清单文件名
+MANIFEST_NAME = 'manifest.json'
+
+# 分区列（年、月），按月份范围裁剪依赖这两列
+PARTITION_COLUMNS = ['day_year', 'day_month']
+
+def get_schema(name):
+    """
+    获取声明的数据模式
+
+    Args:
+        name (str): 模式名称（raw 或 processed）
+
+    Returns:
+        dict: 列名到数据类型的映射
+    """
+    schema = config_manager.get(f'schema.{name}')
+    if not schema:
+        raise ValueError(f"配置中未声明数据模式: {name}")
+    return dict(schema)
+
+def apply_schema(data, name):
+    """
+    按声明的数据模式转换数据类型（只转换数据中存在的列）
+
+    Args:
+        data (pd.DataFrame): 数据
+        name (str): 模式名称
+
+    Returns:
+        pd.DataFrame: 转换类型后的数据
+    """
+    date_format = config_manager.get('schema.date_format')
+    for column, dtype in get_schema(name).items():
+        if column not in data.columns:
+            continue
+        if dtype == 'datetime':
+            data[column] = pd.to_datetime(data[column], format=date_format)
+        elif dtype != 'str':
+            # 字符串列保持读取时的类型，其余列转换为声明的类型
+            data[column] = data[column].astype(dtype)
+    return data
+
+def memory_per_row(data):
+    """
+    计算每行数据占用的内存字节数
+
+    Args:
+        data (pd.DataFrame): 数据
+
+    Returns:
+        float: 每行字节数
+    """
+    if len(data) == 0:
+        return 0.0
+    return data.memory_usage(index=False, deep=True).sum() / len(data)
+
+def _read_csv(path, name, columns=None):
+    """
+    按声明的数据模式读取CSV文件（不输出统计信息）
+    """
+    schema = get_schema(name)
+    if columns is None:
+        columns = list(schema)
+    unknown = [column for column in columns if column not in schema]
+    if unknown:
+        raise ValueError(f"数据模式 {name} 中未声明的列: {unknown}")
+
+    # 日期列先按字符串读取，再用固定格式解析
+    dtypes = {column: (str if schema[column] in ('str', 'datetime') else schema[column])
+              for column in columns}
+
+    data = pd.read_csv(path, usecols=columns, dtype=dtypes, encoding='utf-8-sig')
+    data = apply_schema(data, name)
+    return data[columns]
+
+def _report_read(data, elapsed):
+    """
+    输出读取速度与每行内存
+    """
+    rows_per_sec = len(data) / elapsed if elapsed > 0 else float('inf')
+    print(f"读取 {len(data)} 行, 耗时 {elapsed:.3f} 秒 ({rows_per_sec:.0f} 行/秒), "
+          f"每行内存 {memory_per_row(data):.1f} 字节")
+
+def read_csv_with_schema(path, name, columns=None):
+    """
+    按声明的数据模式读取CSV文件
+
+    Args:
+        path (str): CSV文件路径
+        name (str): 模式名称（raw 或 processed）
+        columns (list): 需要读取的列，默认为模式中声明的全部列
+
+    Returns:
+        pd.DataFrame: 读取的数据
+    """
+    start = time.perf_counter()
+    data = _read_csv(path, name, columns)
+    _report_read(data, time.perf_counter() - start)
+    return data
+
+def parse_month(value):
+    """
+    解析月份字符串
+
+    Args:
+        value (str): 月份字符串（格式: YYYY-MM）
+
+    Returns:
+        tuple: (年, 月)，value为None时返回None
+    """
+    if value is None:
+        return None
+    try:
+        year, month = (int(part) for part in str(value).split('-'))
+    except ValueError:
+        raise ValueError(f"无效的月份: {value}（格式应为 YYYY-MM）")
+    if not 1 <= month <= 12:
+        raise ValueError(f"无效的月份: {value}（月份应在 1 到 12 之间）")
+    return year, month
+
+def _in_month_range(year, month, start_month, end_month):
+    """
+    判断年月是否在 [start_month, end_month] 范围内
+    """
+    start, end = parse_month(start_month), parse_month(end_month)
+    if start is not None and (year, month) < start:
+        return False
+    if end is not None and (year, month) > end:
+        return False
+    return True
+
+def _load_manifest(dataset_dir):
+    """
+    读取分区数据集的清单文件
+    """
+    manifest_path = os.path.join(dataset_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {'partition_columns': PARTITION_COLUMNS, 'partitions': []}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _column_stat(value):
+    """
+    把列统计值转换为可写入JSON的Python数值（缺失值转换为None）
+    """
+    if pd.isna(value):
+        return None
+    if isinstance(value, (bool, int)) or pd.api.types.is_integer(value):
+        return int(value)
+    return float(value)
+
+def write_partitioned_data(data, dataset_dir):
+    """
+    按 day_year/day_month 分区写出数据，并更新清单文件
+
+    数据中出现的分区会被覆盖，其余已有分区保持不变，因此可以只回填某一个月。
+    分区的统计信息在写入任何文件之前全部计算好，清单文件先写临时文件再替换。
+
+    Args:
+        data (pd.DataFrame): 处理后的数据
+        dataset_dir (str): 分区数据集目录
+
+    Returns:
+        dict: 清单内容
+    """
+    partition_columns = PARTITION_COLUMNS
+    manifest = _load_manifest(dataset_dir)
+    partitions = {entry['path']: entry for entry in manifest['partitions']}
+    numeric_columns = data.select_dtypes(include='number').columns
+
+    missing = data[partition_columns].isna().any(axis=1).sum()
+    if missing:
+        print(f"警告: {missing} 行缺少分区列的值，未写入分区数据集")
+
+    # 先计算全部分区的清单条目（统计时跳过缺失值，整列缺失时记为None）
+    parts = []
+    for values, part in data.groupby(partition_columns, sort=True):
+        values = [int(v) for v in values]
+        relative_dir = '/'.join(f"{column}={value}" for column, value in zip(partition_columns, values))
+        relative_path = f"{relative_dir}/part-0.csv"
+        entry = {
+            'path': relative_path,
+            'values': dict(zip(partition_columns, values)),
+            'rows': len(part),
+            'min': {column: _column_stat(part[column].min()) for column in numeric_columns},
+            'max': {column: _column_stat(part[column].max()) for column in numeric_columns}
+        }
+        parts.append((relative_dir, entry, part))
+
+    for relative_dir, entry, part in parts:
+        os.makedirs(os.path.join(dataset_dir, relative_dir), exist_ok=True)
+        part.to_csv(os.path.join(dataset_dir, entry['path']), index=False)
+        partitions[entry['path']] = entry
+
+    manifest = {
+        'partition_columns': partition_columns,
+        'partitions': [partitions[path] for path in sorted(partitions)]
+    }
+    manifest_path = os.path.join(dataset_dir, MANIFEST_NAME)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+def _select_partitions(manifest, start_month, end_month):
+    """
+    根据月份范围裁剪分区
+    """
+    year_column, month_column = manifest['partition_columns']
+    return [entry for entry in manifest['partitions']
+            if _in_month_range(entry['values'][year_column], entry['values'][month_column],
+                               start_month, end_month)]
+
+def read_partitioned_data(dataset_dir, name, columns=None, start_month=None, end_month=None):
+    """
+    读取分区数据集，只读取日期范围内的分区
+
+    Args:
+        dataset_dir (str): 分区数据集目录
+        name (str): 模式名称
+        columns (list): 需要读取的列
+        start_month (str): 起始月份（YYYY-MM，包含）
+        end_month (str): 结束月份（YYYY-MM，包含）
+
+    Returns:
+        pd.DataFrame: 读取的数据
+    """
+    manifest = _load_manifest(dataset_dir)
+    selected = _select_partitions(manifest, start_month, end_month)
+    total_rows = sum(entry['rows'] for entry in manifest['partitions'])
+    selected_rows = sum(entry['rows'] for entry in selected)
+    print(f"分区裁剪: 读取 {len(selected)}/{len(manifest['partitions'])} 个分区, "
+          f"{selected_rows}/{total_rows} 行")
+
+    start = time.perf_counter()
+    parts = [_read_csv(os.path.join(dataset_dir, entry['path']), name, columns) for entry in selected]
+    if parts:
+        data = pd.concat(parts, ignore_index=True)
+    else:
+        data = _read_csv(io.StringIO(','.join(columns or get_schema(name))), name, columns)
+    _report_read(data, time.perf_counter() - start)
+    return data
+
+def processed_data_files(data_path, start_month=None, end_month=None):
+    """
+    列出读取处理后数据时会用到的文件（分区数据集只列出日期范围内的分区）
+
+    Args:
+        data_path (str): 数据路径（CSV文件或分区数据集目录）
+        start_month (str): 起始月份（YYYY-MM，包含）
+        end_month (str): 结束月份（YYYY-MM，包含）
+
+    Returns:
+        list: 文件路径列表
+    """
+    if not os.path.isdir(data_path):
+        return [data_path]
+    manifest = _load_manifest(data_path)
+    return [os.path.join(data_path, entry['path'])
+            for entry in _select_partitions(manifest, start_month, end_month)]
+
+def load_processed_data(data_path, columns=None, start_month=None, end_month=None):
+    """
+    读取处理后的数据，data_path 可以是单个CSV文件或分区数据集目录
+
+    Args:
+        data_path (str): 数据路径
+        columns (list): 需要读取的列
+        start_month (str): 起始月份（YYYY-MM，包含）
+        end_month (str): 结束月份（YYYY-MM，包含）
+
+    Returns:
+        pd.DataFrame: 读取的数据
+    """
+    if os.path.isdir(data_path):
+        # 分区裁剪已经按月份范围读取，只需检查范围内是否有数据
+        return _require_rows(read_partitioned_data(data_path, 'processed', columns, start_month, end_month),
+                             start_month, end_month)
+    if start_month is None and end_month is None:
+        return read_csv_with_schema(data_path, 'processed', columns)
+    return _filter_month_range(data_path, columns, start_month, end_month)
+
+def filter_month_range(data, start_month=None, end_month=None):
+    """
+    按月份范围过滤数据（缺少年月的行会被过滤掉）
+
+    Args:
+        data (pd.DataFrame): 包含 day_year/day_month 列的数据
+        start_month (str): 起始月份（YYYY-MM，包含）
+        end_month (str): 结束月份（YYYY-MM，包含）
+
+    Returns:
+        pd.DataFrame: 过滤后的数据
+    """
+    year_column, month_column = PARTITION_COLUMNS
+    missing = [column for column in PARTITION_COLUMNS if column not in data.columns]
+    if missing:
+        raise ValueError(f"按月份过滤需要的列不存在: {missing}")
+    month_key = data[year_column].astype('Int32') * 100 + data[month_column].astype('Int32')
+    mask = pd.Series(True, index=data.index)
+    start, end = parse_month(start_month), parse_month(end_month)
+    if start is not None:
+        mask &= (month_key >= start[0] * 100 + start[1]).fillna(False).astype(bool)
+    if end is not None:
+        mask &= (month_key <= end[0] * 100 + end[1]).fillna(False).astype(bool)
+    return data.loc[mask].reset_index(drop=True)
+
+def _require_rows(data, start_month, end_month):
+    """
+    检查月份范围内是否有数据
+    """
+    if len(data) == 0:
+        raise ValueError(f"日期范围 {start_month or '-'} ~ {end_month or '-'} 内没有数据")
+    return data
+
+def filter_loaded_data(data, start_month=None, end_month=None):
+    """
+    按月份范围过滤已经读取到内存中的数据并输出过滤后的行数
+
+    Args:
+        data (pd.DataFrame): 包含 day_year/day_month 列的数据
+        start_month (str): 起始月份（YYYY-MM，包含），为None且 end_month 也为None时不过滤
+        end_month (str): 结束月份（YYYY-MM，包含）
+
+    Returns:
+        pd.DataFrame: 过滤后的数据（月份范围内没有数据时抛出 ValueError）
+    """
+    if start_month is None and end_month is None:
+        return data
+    data = filter_month_range(data, start_month, end_month)
+    print(f"按日期过滤后: {len(data)} 行")
+    return _require_rows(data, start_month, end_month)
+
+def _filter_month_range(data_path, columns, start_month, end_month):
+    """
+    读取单个CSV文件后按月份范围过滤（单个文件无法做分区裁剪）
+    """
+    read_columns = None if columns is None else list(dict.fromkeys(columns + PARTITION_COLUMNS))
+    data = filter_loaded_data(read_csv_with_schema(data_path, 'processed', read_columns), start_month, end_month)
+    if columns is not None:
+        data = data[columns]
+    return data
@@ -0,0 +1,111 @@
+"""
+训练设计矩阵工具
+一次性构建 float32 的设计矩阵，训练/测试划分和交叉验证只使用行索引数组
+"""
+import numpy as np
+import scipy.sparse as sp
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.model_selection import train_test_split, KFold
+
+def build_preprocessor(categorical_features, numerical_features):
+    """
+    构建特征预处理器：One-Hot编码用于分类特征，数值特征保持不变
+
+    Args:
+        categorical_features (list): 分类特征列
+        numerical_features (list): 数值特征列
+
+    Returns:
+        ColumnTransformer: 预处理器
+    """
+    return ColumnTransformer(
+        transformers=[
+            ('cat', OneHotEncoder(handle_unknown='ignore', dtype=np.float32), categorical_features),
+            ('num', 'passthrough', numerical_features)
+        ],
+        sparse_threshold=1.0)
+
+def drop_missing_rows(data, columns):
+    """
+    删除指定列中含缺失值的行，没有缺失值时直接返回原数据（不复制）
+
+    Args:
+        data (pd.DataFrame): 数据
+        columns (list): 检查缺失值的列
+
+    Returns:
+        pd.DataFrame: 不含缺失值的数据
+    """
+    valid = data[columns].notna().all(axis=1).to_numpy()
+    if valid.all():
+        return data
+    return data.iloc[np.flatnonzero(valid)]
+
+def build_design_matrix(data, preprocessor, feature_columns, target='age'):
+    """
+    拟合预处理器并构建设计矩阵
+
+    只有存在缺失值时才会按行索引取子集，不会复制整个DataFrame。
+    树模型内部使用 float32，因此直接输出 float32 的CSR稀疏矩阵以避免再次转换。
+
+    Args:
+        data (pd.DataFrame): 数据
+        preprocessor (ColumnTransformer): 未拟合的预处理器
+        feature_columns (list): 特征列
+        target (str): 目标列
+
+    Returns:
+        tuple: (X, y)，X 为 float32 的CSR矩阵，y 为 float64 数组
+    """
+    data = drop_missing_rows(data, feature_columns + [target])
+    X = preprocessor.fit_transform(data)
+    if sp.issparse(X):
+        X = sp.csr_matrix(X, dtype=np.float32)
+    else:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+    y = data[target].to_numpy(dtype=np.float64)
+    return X, y
+
+def matrix_nbytes(X):
+    """
+    计算设计矩阵占用的字节数
+
+    Args:
+        X (np.ndarray or sp.spmatrix): 设计矩阵
+
+    Returns:
+        int: 字节数
+    """
+    if sp.issparse(X):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+def split_indices(n_samples, test_size, random_state):
+    """
+    生成训练集/测试集的行索引（与对数据直接调用 train_test_split 的划分一致）
+
+    Args:
+        n_samples (int): 样本数
+        test_size (float): 测试集比例
+        random_state (int): 随机种子
+
+    Returns:
+        tuple: (train_idx, test_idx)
+    """
+    return train_test_split(np.arange(n_samples), test_size=test_size, random_state=random_state)
+
+def cv_split_indices(n_samples, n_folds, random_state):
+    """
+    生成交叉验证各折的行索引
+
+    Args:
+        n_samples (int): 样本数
+        n_folds (int): 折数
+        random_state (int): 随机种子
+
+    Returns:
+        list: [(train_idx, test_idx), ...]
+    """
+    kfold = KFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+    return list(kfold.split(np.empty((n_samples, 0))))
@@ -0,0 +1,132 @@
+"""
+置换特征重要性工具
+在原始特征列层面计算置换重要性：分类特征的全部 One-Hot 列作为一个整体置换，
+只构建一次编码后的矩阵，各特征的置换在进程池中并行计算
+"""
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from scipy import stats
+from sklearn.metrics import mean_squared_error
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+def _rmse(y_true, y_pred):
+    return float(np.sqrt(mean_squared_error(y_true, y_pred)))
+
+def feature_blocks(preprocessor):
+    """
+    计算每个原始特征在编码后矩阵中对应的列范围
+
+    Args:
+        preprocessor (ColumnTransformer): 已拟合的预处理器
+
+    Returns:
+        dict: 原始特征名到 (起始列, 结束列) 的映射；无法映射时返回None
+    """
+    blocks = {}
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == 'remainder':
+            continue
+        start = preprocessor.output_indices_[name].start
+        if isinstance(transformer, OneHotEncoder) and transformer.drop is None:
+            widths = [len(categories) for categories in transformer.categories_]
+        elif transformer == 'passthrough' or getattr(transformer, 'feature_names_out', None) == 'one-to-one':
+            widths = [1] * len(columns)
+        else:
+            return None
+        for column, width in zip(columns, widths):
+            blocks[column] = (start, start + width)
+            start += width
+    return blocks
+
+def _permuted_scores_encoded(regressor, X, y, start, end, seeds):
+    """
+    在编码后的矩阵上置换某个原始特征对应的列块并计算RMSE（在工作进程中执行）
+    """
+    left, block, right = X[:, :start], X[:, start:end], X[:, end:]
+    scores = []
+    for seed in seeds:
+        permutation = np.random.RandomState(seed).permutation(X.shape[0])
+        X_permuted = sp.hstack([left, block[permutation], right], format='csr')
+        scores.append(_rmse(y, regressor.predict(X_permuted)))
+    return scores
+
+def _permuted_scores_frame(model, X, y, column, seeds):
+    """
+    直接在原始特征数据上置换某一列并计算RMSE（在工作进程中执行）
+    """
+    scores = []
+    for seed in seeds:
+        X_permuted = X.copy()
+        permutation = np.random.RandomState(seed).permutation(len(X))
+        X_permuted[column] = X[column].to_numpy()[permutation]
+        scores.append(_rmse(y, model.predict(X_permuted)))
+    return scores
+
+def permutation_importance(model, X, y, n_repeats=5, sample_size=None, n_jobs=-1,
+                           confidence=0.95, random_state=42):
+    """
+    计算原始特征列的置换重要性（置换后RMSE的增加量）
+
+    模型为 prep + reg 的 Pipeline 时，只编码一次数据，之后每次置换只重排对应特征的列块；
+    其他模型（如分段模型）在原始特征数据上置换。
+
+    Args:
+        model: 已训练的模型
+        X (pd.DataFrame): 原始特征数据
+        y (array-like): 目标值
+        n_repeats (int): 每个特征的置换次数
+        sample_size (int): 行子样本大小，None 表示使用全部行
+        n_jobs (int): 并行的工作进程数
+        confidence (float): 置信区间的置信水平
+        random_state (int): 随机种子
+
+    Returns:
+        pd.DataFrame: 各特征的重要性均值、标准差和置信区间，按重要性降序排列
+    """
+    y = np.asarray(y, dtype=np.float64)
+    rng = np.random.RandomState(random_state)
+    if sample_size is not None and sample_size < len(X):
+        rows = np.sort(rng.choice(len(X), size=sample_size, replace=False))
+        X, y = X.iloc[rows], y[rows]
+    seeds = rng.randint(np.iinfo(np.int32).max, size=n_repeats).tolist()
+    columns = list(X.columns)
+
+    blocks = None
+    if isinstance(model, Pipeline) and 'prep' in model.named_steps:
+        blocks = feature_blocks(model.named_steps['prep'])
+    if blocks is not None and all(column in blocks for column in columns):
+        regressor = model.steps[-1][1]
+        X_encoded = sp.csr_matrix(model.named_steps['prep'].transform(X), dtype=np.float32)
+        baseline = _rmse(y, regressor.predict(X_encoded))
+        tasks = (delayed(_permuted_scores_encoded)(regressor, X_encoded, y, *blocks[column], seeds)
+                 for column in columns)
+    else:
+        baseline = _rmse(y, model.predict(X))
+        tasks = (delayed(_permuted_scores_frame)(model, X, y, column, seeds) for column in columns)
+
+    results = Parallel(n_jobs=n_jobs)(tasks)
+
+    rows = []
+    for column, scores in zip(columns, results):
+        importances = np.asarray(scores) - baseline
+        mean = importances.mean()
+        if n_repeats > 1:
+            std = importances.std(ddof=1)
+            margin = stats.t.ppf((1 + confidence) / 2, n_repeats - 1) * std / np.sqrt(n_repeats)
+        else:
+            std = margin = 0.0
+        rows.append({
+            'feature': column,
+            'importance_mean': mean,
+            'importance_std': std,
+            'ci_lower': mean - margin,
+            'ci_upper': mean + margin
+        })
+
+    result = pd.DataFrame(rows).sort_values('importance_mean', ascending=False).reset_index(drop=True)
+    result.attrs['baseline_rmse'] = baseline
+    result.attrs['n_rows'] = len(y)
+    return result
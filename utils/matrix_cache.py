@@ -0,0 +1,152 @@
+"""
+设计矩阵缓存工具
+把编码后的训练矩阵和已拟合的预处理器保存到磁盘（可内存映射的 .npy 文件），
+以数据内容和特征配置的指纹为键，只调整模型参数时可直接复用
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+import joblib
+import numpy as np
+import scipy.sparse as sp
+import sklearn
+
+# 缓存格式版本，格式变化时递增以使旧缓存失效
+CACHE_VERSION = 1
+
+def design_matrix_fingerprint(data_files, feature_config, preprocessor):
+    """
+    计算数据文件内容、特征配置、预处理器参数和 scikit-learn 版本的指纹
+
+    Args:
+        data_files (list): 数据文件路径列表
+        feature_config (dict): 影响编码结果的配置（特征列、数据模式、日期范围等）
+        preprocessor (ColumnTransformer): 未拟合的预处理器，其参数变化时缓存失效
+
+    Returns:
+        str: 十六进制指纹
+    """
+    payload = {
+        'version': CACHE_VERSION,
+        'sklearn': sklearn.__version__,
+        'config': feature_config,
+        'preprocessor': {key: repr(value) for key, value in preprocessor.get_params(deep=True).items()}
+    }
+    digest = hashlib.sha256()
+    digest.update(json.dumps(payload, sort_keys=True, default=str).encode('utf-8'))
+    for path in data_files:
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+def save_design_matrix(cache_dir, fingerprint, X, y, preprocessor):
+    """
+    保存设计矩阵、目标值和预处理器（先写临时目录再改名，避免留下不完整的缓存）
+
+    Args:
+        cache_dir (str): 缓存根目录
+        fingerprint (str): 指纹
+        X (sp.csr_matrix or np.ndarray): 设计矩阵
+        y (np.ndarray): 目标值
+        preprocessor (ColumnTransformer): 已拟合的预处理器
+
+    Returns:
+        str: 缓存目录
+    """
+    entry_dir = os.path.join(cache_dir, fingerprint)
+    if os.path.isdir(entry_dir):
+        return entry_dir
+    tmp_dir = os.path.join(cache_dir, f".{fingerprint}.{uuid.uuid4().hex}")
+    os.makedirs(tmp_dir)
+
+    meta = {'version': CACHE_VERSION, 'shape': list(X.shape), 'sparse': sp.issparse(X)}
+    if sp.issparse(X):
+        np.save(os.path.join(tmp_dir, 'X_data.npy'), X.data)
+        np.save(os.path.join(tmp_dir, 'X_indices.npy'), X.indices)
+        np.save(os.path.join(tmp_dir, 'X_indptr.npy'), X.indptr)
+    else:
+        np.save(os.path.join(tmp_dir, 'X.npy'), X)
+    np.save(os.path.join(tmp_dir, 'y.npy'), y)
+    joblib.dump(preprocessor, os.path.join(tmp_dir, 'preprocessor.pkl'))
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # 其他进程已经写入了同一个缓存
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return entry_dir
+
+def load_design_matrix(cache_dir, fingerprint):
+    """
+    以内存映射方式加载缓存的设计矩阵
+
+    Args:
+        cache_dir (str): 缓存根目录
+        fingerprint (str): 指纹
+
+    Returns:
+        tuple: (X, y, preprocessor)，没有缓存时返回None
+    """
+    entry_dir = os.path.join(cache_dir, fingerprint)
+    meta_path = os.path.join(entry_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != CACHE_VERSION:
+        return None
+    # 更新访问时间，清理时按最近使用时间淘汰
+    os.utime(meta_path)
+
+    def load(name):
+        return np.load(os.path.join(entry_dir, name), mmap_mode='r')
+
+    if meta['sparse']:
+        X = sp.csr_matrix((load('X_data.npy'), load('X_indices.npy'), load('X_indptr.npy')),
+                          shape=tuple(meta['shape']), copy=False)
+    else:
+        X = load('X.npy')
+    y = load('y.npy')
+    preprocessor = joblib.load(os.path.join(entry_dir, 'preprocessor.pkl'))
+    return X, y, preprocessor
+
+def prune_cache(cache_dir, max_entries=None, max_age_days=None):
+    """
+    清理设计矩阵缓存：删除超过 max_age_days 天未使用的条目，
+    再按最近使用时间只保留 max_entries 个条目
+
+    Args:
+        cache_dir (str): 缓存根目录
+        max_entries (int): 最多保留的条目数，None表示不限制
+        max_age_days (float): 条目最长保留天数，None表示不限制
+
+    Returns:
+        list: 被删除的缓存目录
+    """
+    if not os.path.isdir(cache_dir):
+        return []
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        meta_path = os.path.join(cache_dir, name, 'meta.json')
+        if not name.startswith('.') and os.path.exists(meta_path):
+            entries.append((os.path.getmtime(meta_path), os.path.join(cache_dir, name)))
+    # 最近使用的排在前面
+    entries.sort(reverse=True)
+
+    removed = []
+    now = time.time()
+    for rank, (mtime, entry_dir) in enumerate(entries):
+        expired = max_age_days is not None and now - mtime > max_age_days * 86400
+        over_limit = max_entries is not None and rank >= max_entries
+        if expired or over_limit:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            removed.append(entry_dir)
+    return removed
@@ -8,6 +8,7 @@ import seaborn as sns
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 import joblib
 import os
+from utils.data_io import read_csv_with_schema
 
 def evaluate_predictions(y_true, y_pred, title="模型评估结果"):
     """
@@ -102,7 +103,7 @@ def load_and_evaluate_model(model_path, test_data_path):
     model = joblib.load(model_path)
     
     # 加载测试数据
-    test_data = pd.read_csv(test_data_path)
+    test_data = read_csv_with_schema(test_data_path, 'processed')
     
     # 分离特征和目标
     feature_columns = test_data.columns[:-1]  # 假设最后一列是目标变量
@@ -0,0 +1,125 @@
+"""
+预测缓存工具
+以工程特征向量的哈希为键缓存预测结果，重复出现的特征组合无需再次调用模型
+"""
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from configs.config_manager import config_manager
+
+class PredictionCache:
+    """
+    有界的预测缓存，放在模型前面，提供与模型相同的 predict 接口
+    """
+    def __init__(self, model, feature_columns, max_size=100000, policy='lru'):
+        """
+        初始化预测缓存
+
+        Args:
+            model: 已训练的模型（需要提供 predict 方法）
+            feature_columns (list): 参与计算缓存键的特征列
+            max_size (int): 最多缓存的条目数
+            policy (str): 淘汰策略，lru 淘汰最久未使用的条目，fifo 淘汰最早写入的条目
+        """
+        if policy not in ('lru', 'fifo'):
+            raise ValueError(f"不支持的缓存淘汰策略: {policy}")
+        if max_size <= 0:
+            raise ValueError(f"缓存大小必须为正数: {max_size}")
+        self.model = model
+        self.feature_columns = list(feature_columns)
+        self.max_size = max_size
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def feature_keys(self, X):
+        """
+        计算每行特征向量的哈希值
+
+        Args:
+            X (pd.DataFrame): 特征数据
+
+        Returns:
+            np.ndarray: uint64 哈希数组
+        """
+        return pd.util.hash_pandas_object(X[self.feature_columns], index=False).to_numpy()
+
+    def predict(self, X):
+        """
+        预测，命中缓存的行直接返回缓存结果，其余行去重后批量调用模型
+
+        Args:
+            X (pd.DataFrame): 特征数据
+
+        Returns:
+            np.ndarray: 预测值
+        """
+        keys = self.feature_keys(X)
+        predictions = np.empty(len(keys), dtype=np.float64)
+        missing = {}
+        for position, key in enumerate(keys.tolist()):
+            value = self._entries.get(key)
+            if value is not None:
+                predictions[position] = value
+                if self.policy == 'lru':
+                    self._entries.move_to_end(key)
+            else:
+                missing.setdefault(key, []).append(position)
+
+        # 同一批次内重复的特征组合只有第一次出现记为未命中
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        if missing:
+            first_positions = [positions[0] for positions in missing.values()]
+            values = self.model.predict(X.iloc[first_positions])
+            for (key, positions), value in zip(missing.items(), values.tolist()):
+                predictions[positions] = value
+                self._entries[key] = value
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return predictions
+
+    def stats(self):
+        """
+        获取缓存统计信息
+
+        Returns:
+            dict: 命中数、未命中数、命中率、淘汰数和当前大小
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+            'size': len(self._entries)
+        }
+
+    def clear(self):
+        """
+        清空缓存和统计信息
+        """
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+def with_prediction_cache(model, feature_columns):
+    """
+    按配置在模型前面加上预测缓存
+
+    Args:
+        model: 已训练的模型
+        feature_columns (list): 特征列
+
+    Returns:
+        启用缓存时返回 PredictionCache，否则返回原模型
+    """
+    if not config_manager.get('cache.enabled', False):
+        return model
+    return PredictionCache(model, feature_columns,
+                           max_size=config_manager.get('cache.max_size', 100000),
+                           policy=config_manager.get('cache.policy', 'lru'))
@@ -0,0 +1,86 @@
+"""
+性能分析工具
+"""
+import os
+import sys
+import threading
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块
+    resource = None
+
+def peak_rss_mb():
+    """
+    获取当前进程从启动到现在的峰值常驻内存（RSS）
+
+    Returns:
+        float: 峰值RSS（MB），当前平台不支持时返回None
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以KB为单位
+    if sys.platform == 'darwin':
+        return peak / 1024 / 1024
+    return peak / 1024
+
+def current_rss_mb():
+    """
+    获取当前进程此刻的常驻内存（RSS）
+
+    Returns:
+        float: 当前RSS（MB），当前平台不支持时返回None
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+class RssSampler:
+    """
+    在后台线程中定时采样RSS，记录一段代码执行期间的峰值
+
+    用法:
+        with RssSampler() as sampler:
+            regressor.fit(X, y)
+        sampler.peak_mb
+    """
+    def __init__(self, interval_seconds=0.01):
+        """
+        初始化RSS采样器
+
+        Args:
+            interval_seconds (float): 采样间隔（秒）
+        """
+        self.interval_seconds = interval_seconds
+        self.start_mb = None
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self._sample()
+
+    def __enter__(self):
+        self.start_mb = current_rss_mb()
+        self.peak_mb = self.start_mb
+        if self.start_mb is not None:
+            self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._sample()
+        return False
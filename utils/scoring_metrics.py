@@ -0,0 +1,233 @@
+"""
+预测性能指标工具
+记录打分的行数、批次大小、特征构建耗时、模型耗时和延迟分布，并定时写出为
+Prometheus 文本格式或 JSON 快照
+"""
+from collections import deque
+import json
+import os
+import threading
+import time
+import numpy as np
+from configs.config_manager import config_manager
+
+# 默认的延迟直方图分桶（秒）
+DEFAULT_LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+class ScoringMetrics:
+    """
+    打分性能指标（线程安全）
+    """
+    def __init__(self, latency_buckets=None, max_samples=10000):
+        """
+        初始化打分性能指标
+
+        Args:
+            latency_buckets (list): 延迟直方图的分桶上界（秒）
+            max_samples (int): 计算分位数时保留的最近延迟样本数
+        """
+        self.latency_buckets = sorted(latency_buckets or DEFAULT_LATENCY_BUCKETS)
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=max_samples)
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_batch_size = 0
+        self.featurize_seconds = 0.0
+        self.model_seconds = 0.0
+        self.latency_seconds = 0.0
+        self.bucket_counts = [0] * len(self.latency_buckets)
+
+    def observe_featurize(self, seconds):
+        """
+        记录一次特征构建耗时
+
+        Args:
+            seconds (float): 耗时（秒）
+        """
+        with self._lock:
+            self.featurize_seconds += seconds
+
+    def observe_error(self):
+        """
+        记录一次打分失败
+        """
+        with self._lock:
+            self.errors += 1
+
+    def observe_batch(self, rows, model_seconds, latency_seconds=None):
+        """
+        记录一个批次的打分
+
+        Args:
+            rows (int): 批次行数
+            model_seconds (float): 模型预测耗时（秒）
+            latency_seconds (float): 批次端到端延迟（秒），默认等于模型耗时
+        """
+        if latency_seconds is None:
+            latency_seconds = model_seconds
+        with self._lock:
+            self.rows += rows
+            self.batches += 1
+            self.max_batch_size = max(self.max_batch_size, rows)
+            self.model_seconds += model_seconds
+            self.latency_seconds += latency_seconds
+            self._samples.append(latency_seconds)
+            for i, bound in enumerate(self.latency_buckets):
+                if latency_seconds <= bound:
+                    self.bucket_counts[i] += 1
+
+    def snapshot(self):
+        """
+        获取当前指标快照
+
+        Returns:
+            dict: 指标快照
+        """
+        with self._lock:
+            samples = np.array(self._samples, dtype=np.float64)
+            p50, p95, p99 = (np.percentile(samples, [50, 95, 99]).tolist()
+                             if len(samples) else (0.0, 0.0, 0.0))
+            return {
+                'timestamp': time.time(),
+                'rows': self.rows,
+                'batches': self.batches,
+                'errors': self.errors,
+                'mean_batch_size': self.rows / self.batches if self.batches else 0.0,
+                'max_batch_size': self.max_batch_size,
+                'featurize_seconds': self.featurize_seconds,
+                'model_seconds': self.model_seconds,
+                'rows_per_second': self.rows / self.model_seconds if self.model_seconds else 0.0,
+                'latency_seconds': {
+                    'sum': self.latency_seconds,
+                    'count': self.batches,
+                    'p50': p50,
+                    'p95': p95,
+                    'p99': p99,
+                    'buckets': dict(zip(self.latency_buckets, self.bucket_counts))
+                }
+            }
+
+def format_prometheus(snapshot, prefix='scoring'):
+    """
+    把指标快照格式化为 Prometheus 文本格式
+
+    Args:
+        snapshot (dict): 指标快照
+        prefix (str): 指标名前缀
+
+    Returns:
+        str: Prometheus 文本
+    """
+    latency = snapshot['latency_seconds']
+    lines = []
+
+    def add(name, kind, help_text, samples):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{prefix}_{name}{suffix}{labels} {value}")
+
+    add('rows_total', 'counter', 'Rows scored.', [('', '', snapshot['rows'])])
+    add('batches_total', 'counter', 'Scoring batches.', [('', '', snapshot['batches'])])
+    add('errors_total', 'counter', 'Failed scoring attempts.', [('', '', snapshot['errors'])])
+    add('batch_size_max', 'gauge', 'Largest scoring batch.', [('', '', snapshot['max_batch_size'])])
+    add('featurize_seconds_total', 'counter', 'Time spent building features.',
+        [('', '', snapshot['featurize_seconds'])])
+    add('model_seconds_total', 'counter', 'Time spent in model.predict.',
+        [('', '', snapshot['model_seconds'])])
+    add('latency_seconds', 'histogram', 'Per-batch scoring latency.',
+        [('_bucket', f'{{le="{bound}"}}', count) for bound, count in latency['buckets'].items()]
+        + [('_bucket', '{le="+Inf"}', latency['count']),
+           ('_sum', '', latency['sum']),
+           ('_count', '', latency['count'])])
+    add('latency_quantile_seconds', 'gauge', 'Per-batch scoring latency quantiles over recent batches.',
+        [('', f'{{quantile="{q}"}}', latency[key]) for q, key in (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99'))])
+    return '\n'.join(lines) + '\n'
+
+def write_snapshot(metrics, path, fmt='prometheus'):
+    """
+    写出指标快照（先写临时文件再替换，避免读到写了一半的文件）
+
+    Args:
+        metrics (ScoringMetrics): 打分性能指标
+        path (str): 输出路径
+        fmt (str): 输出格式，prometheus 或 json
+    """
+    snapshot = metrics.snapshot()
+    if fmt == 'prometheus':
+        content = format_prometheus(snapshot)
+    elif fmt == 'json':
+        content = json.dumps(snapshot, indent=2)
+    else:
+        raise ValueError(f"不支持的指标格式: {fmt}")
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+class MetricsReporter:
+    """
+    在后台线程中按固定间隔写出指标快照
+    """
+    def __init__(self, metrics, path, interval_seconds=15, fmt='prometheus'):
+        """
+        初始化指标写出器
+
+        Args:
+            metrics (ScoringMetrics): 打分性能指标
+            path (str): 输出路径
+            interval_seconds (float): 写出间隔（秒）
+            fmt (str): 输出格式，prometheus 或 json
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.fmt = fmt
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            write_snapshot(self.metrics, self.path, self.fmt)
+
+    def start(self):
+        """
+        启动后台写出线程
+
+        Returns:
+            MetricsReporter: self
+        """
+        self._thread = threading.Thread(target=self._run, name='scoring-metrics', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        停止后台线程并写出最终快照
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        write_snapshot(self.metrics, self.path, self.fmt)
+
+def start_reporter(metrics, project_root):
+    """
+    按配置启动指标写出器
+
+    Args:
+        metrics (ScoringMetrics): 打分性能指标
+        project_root (str): 项目根目录（用于解析相对路径）
+
+    Returns:
+        MetricsReporter: 启用监控时返回写出器，否则返回None
+    """
+    if not config_manager.get('monitoring.enabled', False):
+        return None
+    path = os.path.join(project_root, config_manager.get('monitoring.metrics_path'))
+    return MetricsReporter(metrics, path,
+                           interval_seconds=config_manager.get('monitoring.interval_seconds', 15),
+                           fmt=config_manager.get('monitoring.format', 'prometheus')).start()
@@ -0,0 +1,160 @@
+"""
+分段模型工具
+按分段列（默认 cat1）并行训练多个模型，预测时把每行路由到所属分段的模型
+"""
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, RegressorMixin, clone
+from sklearn.pipeline import Pipeline
+
+# 全局兜底模型的分段键
+FALLBACK_SEGMENT = '__fallback__'
+
+def assign_segments(counts, min_segment_size):
+    """
+    根据各分段值的样本数划分模型分段
+
+    样本数达到阈值的分段值单独建模；不足阈值的分段值按样本数从小到大合并成组，
+    组的样本数达到阈值后单独建模；最后仍不足阈值的分段值使用全局兜底模型。
+
+    Args:
+        counts (pd.Series): 分段值到样本数的映射
+        min_segment_size (int): 单个模型的最少样本数
+
+    Returns:
+        dict: 分段值到分段键的映射（不在映射中的分段值使用兜底模型）
+    """
+    segment_map = {}
+    small = []
+    for value, count in zip(counts.index.tolist(), counts.tolist()):
+        if count >= min_segment_size:
+            segment_map[value] = str(value)
+        else:
+            small.append((value, count))
+
+    group, group_size = [], 0
+    for value, count in sorted(small, key=lambda item: item[1]):
+        group.append(value)
+        group_size += count
+        if group_size >= min_segment_size:
+            key = 'group_' + '_'.join(str(v) for v in group)
+            segment_map.update({v: key for v in group})
+            group, group_size = [], 0
+    return segment_map
+
+def _fit_segment(key, preprocessor, regressor, X, y):
+    """
+    训练单个分段的模型（在工作进程中执行）
+    """
+    model = Pipeline(steps=[('prep', clone(preprocessor)), ('reg', clone(regressor))])
+    model.fit(X, y)
+    return key, model
+
+class SegmentedRegressor(BaseEstimator, RegressorMixin):
+    """
+    分段回归器：每个分段一个模型，外加一个全局兜底模型
+
+    兜底模型负责稀有分段和预测时遇到的新分段。为了不让它成为并行训练中最慢的任务，
+    它的训练行数不超过 fallback_max_rows（默认等于最大分段的行数）：优先使用全部稀有分段的行，
+    剩余名额从其他分段中均匀随机抽样补足，使其仍能覆盖所有分段。
+    """
+    def __init__(self, preprocessor, regressor, segment_column='cat1', min_segment_size=50, n_jobs=-1,
+                 fallback_max_rows=None, random_state=42):
+        """
+        初始化分段回归器
+
+        Args:
+            preprocessor (ColumnTransformer): 未拟合的特征预处理器
+            regressor (BaseEstimator): 未训练的回归器
+            segment_column (str): 分段列
+            min_segment_size (int): 单个模型的最少样本数
+            n_jobs (int): 并行训练的工作进程数
+            fallback_max_rows (int): 兜底模型的最大训练行数，默认等于最大分段的行数
+            random_state (int): 兜底模型抽样的随机种子
+        """
+        self.preprocessor = preprocessor
+        self.regressor = regressor
+        self.segment_column = segment_column
+        self.min_segment_size = min_segment_size
+        self.n_jobs = n_jobs
+        self.fallback_max_rows = fallback_max_rows
+        self.random_state = random_state
+
+    def segment_keys(self, X):
+        """
+        计算每行所属的分段键
+
+        Args:
+            X (pd.DataFrame): 特征数据
+
+        Returns:
+            np.ndarray: 分段键数组
+        """
+        keys = X[self.segment_column].map(self.segment_map_)
+        keys = keys.where(keys.isin(list(self.models_)), FALLBACK_SEGMENT)
+        return keys.to_numpy(dtype=object)
+
+    def fit(self, X, y):
+        """
+        并行训练各分段模型和全局兜底模型
+
+        Args:
+            X (pd.DataFrame): 特征数据
+            y (array-like): 目标值
+
+        Returns:
+            SegmentedRegressor: self
+        """
+        y = np.asarray(y)
+        self.segment_map_ = assign_segments(X[self.segment_column].value_counts(), self.min_segment_size)
+        keys = X[self.segment_column].map(self.segment_map_).fillna(FALLBACK_SEGMENT).to_numpy(dtype=object)
+        groups = pd.Series(keys).groupby(keys).indices
+        rare_positions = groups.pop(FALLBACK_SEGMENT, np.array([], dtype=np.intp))
+        fallback_positions = self._fallback_positions(rare_positions, groups, len(y))
+
+        tasks = [(FALLBACK_SEGMENT, X.iloc[fallback_positions], y[fallback_positions])]
+        tasks += [(key, X.iloc[positions], y[positions]) for key, positions in groups.items()]
+        # 先提交样本数多的分段，减少并行时的等待
+        tasks.sort(key=lambda task: len(task[2]), reverse=True)
+
+        results = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_segment)(key, self.preprocessor, self.regressor, X_seg, y_seg)
+            for key, X_seg, y_seg in tasks)
+        self.models_ = dict(results)
+        self.segment_sizes_ = {key: len(y_seg) for key, X_seg, y_seg in tasks}
+        return self
+
+    def _fallback_positions(self, rare_positions, groups, n_samples):
+        """
+        选择兜底模型的训练行：全部稀有分段的行，加上从其他分段均匀抽样的行，总数不超过上限
+        """
+        max_rows = self.fallback_max_rows
+        if max_rows is None:
+            max_rows = max((len(positions) for positions in groups.values()), default=n_samples)
+        max_rows = max(max_rows, self.min_segment_size)
+
+        rng = np.random.RandomState(self.random_state)
+        if len(rare_positions) >= max_rows:
+            return np.sort(rng.choice(rare_positions, size=max_rows, replace=False))
+
+        assigned = np.setdiff1d(np.arange(n_samples), rare_positions)
+        n_extra = min(max_rows - len(rare_positions), len(assigned))
+        extra = rng.choice(assigned, size=n_extra, replace=False)
+        return np.sort(np.concatenate([rare_positions, extra]))
+
+    def predict(self, X):
+        """
+        按分段分组批量预测
+
+        Args:
+            X (pd.DataFrame): 特征数据
+
+        Returns:
+            np.ndarray: 预测值
+        """
+        keys = self.segment_keys(X)
+        predictions = np.empty(len(X), dtype=np.float64)
+        for key, positions in pd.Series(keys).groupby(keys).indices.items():
+            predictions[positions] = self.models_[key].predict(X.iloc[positions])
+        return predictions